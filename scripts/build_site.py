@@ -11,42 +11,87 @@ Saída:
     - models.json
     - <slug>/index.html (viewer)
     - <slug>/model.glb
-    - <slug>/metadata.json
+    - <slug>/metadata.json (+ .json.gz / .json.br pré-comprimidos)
 
 Requisitos:
-  - IfcConvert (binário) no PATH ou fornecido via --ifcconvert
+  - IfcConvert (binário) no PATH ou fornecido via --ifcconvert; usado quando
+    a conversão via ifcopenshell.geom não está disponível ou falha
   - ifcopenshell (pip) para extração de metadados
+  - orjson (pip) para serialização do JSON
+  - brotli (pip, opcional) para gerar metadata.json.br
 """
 
 from __future__ import annotations
 
 import argparse
-import json
+import concurrent.futures
+import functools
+import gzip
+import hashlib
 import os
 import re
 import shutil
 import subprocess
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterable
+
+import orjson
 
 try:
     import ifcopenshell  # type: ignore
 except Exception as e:
     ifcopenshell = None  # type: ignore
 
+try:
+    import ifcopenshell.geom as ifcgeom  # type: ignore
+except Exception:
+    ifcgeom = None  # type: ignore
+
+try:
+    import brotli  # type: ignore
+except Exception:
+    brotli = None  # type: ignore
+
+
+_SLUG_NONALNUM = re.compile(r"[^a-z0-9\-_]+")
+_SLUG_DASHES = re.compile(r"-+")
+
 
 def slugify(name: str) -> str:
     name = name.strip().lower()
-    name = re.sub(r"[^a-z0-9\-_]+", "-", name, flags=re.IGNORECASE)
-    name = re.sub(r"-+", "-", name).strip("-")
+    name = _SLUG_NONALNUM.sub("-", name)
+    name = _SLUG_DASHES.sub("-", name).strip("-")
     return name or "modelo"
 
 
-def run(cmd: list[str], cwd: Path | None = None) -> None:
-    print("$", " ".join(cmd))
-    subprocess.check_call(cmd, cwd=str(cwd) if cwd else None)
+def log(msg: str) -> None:
+    # Uma única escrita por linha (texto + "\n"): com vários modelos e a
+    # thread do IfcConvert em paralelo, print() normal pode se intercalar
+    # entre o texto e a quebra de linha
+    sys.stdout.write(msg + "\n")
+    sys.stdout.flush()
+
+
+def run(cmd: list[str], cwd: Path | None = None, tag: str = "") -> None:
+    log(f"{tag}$ {' '.join(cmd)}")
+    # stdout do IfcConvert é só progresso (uma linha por %): descartado para
+    # não travar o processo escrevendo no log do CI. stderr só em caso de falha.
+    try:
+        subprocess.run(
+            cmd,
+            cwd=str(cwd) if cwd else None,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+    except subprocess.CalledProcessError as e:
+        stderr = (e.stderr or b"").decode("utf-8", errors="replace").strip()
+        if stderr:
+            log("\n".join(f"{tag}{line}" for line in stderr.splitlines()))
+        raise
 
 
 def find_ifcconvert(user_path: str | None) -> str:
@@ -68,91 +113,299 @@ def find_ifcconvert(user_path: str | None) -> str:
     raise FileNotFoundError("IfcConvert não encontrado. Defina --ifcconvert ou IFCCONVERT_BIN.")
 
 
+# Conversão para JSON: percorre a árvore com uma pilha explícita (psets
+# profundos não estouram a recursão) e escolhe o tratamento por type(v).
+# Cada handler recebe o valor e a pilha; contêineres devolvem a estrutura
+# de saída vazia e empilham os filhos como (destino, chave, valor).
+_Stack = list[tuple[Any, Any, Any]]
+
+# Folhas comuns dos psets (95%+ dos valores): copiadas direto, sem passar
+# pela pilha nem pela tabela. Comparação exata de tipo, não isinstance.
+# int fica de fora: precisa da checagem de faixa de _int.
+_LEAF_TYPES = frozenset({str, float, bool, type(None)})
+
+
+def _id(v: Any, stack: _Stack) -> Any:
+    return v
+
+
+def _int(v: int, stack: _Stack) -> Any:
+    # orjson só codifica inteiros de 64 bits
+    return v if -(2**63) <= v < 2**64 else str(v)
+
+
+def _walk_dict(v: Any, stack: _Stack) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for k, val in v.items():
+        key = k if type(k) is str else str(k)
+        if type(val) in _LEAF_TYPES:
+            out[key] = val
+        else:
+            out[key] = None  # reserva a posição para manter a ordem das chaves
+            stack.append((out, key, val))
+    return out
+
+
+def _walk_list(v: Any, stack: _Stack) -> list[Any]:
+    out: list[Any] = [None] * len(v)
+    for i, x in enumerate(v):
+        if type(x) in _LEAF_TYPES:
+            out[i] = x
+        else:
+            stack.append((out, i, x))
+    return out
+
+
+def _fallback(v: Any, stack: _Stack) -> Any:
+    if ifcopenshell is not None and isinstance(v, ifcopenshell.entity_instance):  # type: ignore
+        # Ex: IfcLabel('ABC'), IfcLengthMeasure(1.23) etc
+        # Preferimos string curta
+        try:
+            return str(v)
+        except Exception:
+            return {"id": getattr(v, "id", lambda: None)()}
+    # Subclasses dos tipos básicos (IntEnum, numpy.float64...): o orjson
+    # recusa subclasses, então converte para o tipo base
+    if isinstance(v, str):
+        return str(v)
+    if isinstance(v, bool):
+        return bool(v)
+    if isinstance(v, int):
+        return _int(int(v), stack)
+    if isinstance(v, float):
+        return float(v)
+    if isinstance(v, dict):
+        return _walk_dict(v, stack)
+    if isinstance(v, (list, tuple, set)):
+        return _walk_list(v, stack)
+    # numpy / decimals
+    if hasattr(v, "item") and callable(getattr(v, "item")):
+        try:
+            x = v.item()
+        except Exception:
+            # Ex: array numpy com mais de um elemento
+            return str(v)
+        return _DISPATCH.get(type(x), _fallback)(x, stack)
+    return str(v)
+
+
+_DISPATCH = {
+    str: _id,
+    int: _int,
+    float: _id,
+    bool: _id,
+    type(None): _id,
+    dict: _walk_dict,
+    list: _walk_list,
+    tuple: _walk_list,
+    set: _walk_list,
+}
+
+
 def to_jsonable(v: Any) -> Any:
     # Converte valores do ifcopenshell (e tipos estranhos) para JSON
-    try:
-        if ifcopenshell is not None and isinstance(v, ifcopenshell.entity_instance):  # type: ignore
-            # Ex: IfcLabel('ABC'), IfcLengthMeasure(1.23) etc
-            # Preferimos string curta
+    if type(v) in _LEAF_TYPES:
+        return v
+    root: list[Any] = [None]
+    stack: _Stack = [(root, 0, v)]
+    while stack:
+        dst, key, val = stack.pop()
+        dst[key] = _DISPATCH.get(type(val), _fallback)(val, stack)
+    return root[0]
+
+
+def product_types(model: Any, exclude: tuple[str, ...] = ("IfcOpeningElement",)) -> list[str]:
+    """Tipos concretos de IfcProduct no schema do modelo, sem as subárvores de exclude."""
+    schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(model.schema_identifier)  # type: ignore
+    out: list[str] = []
+    stack = [schema.declaration_by_name("IfcProduct")]
+    while stack:
+        decl = stack.pop()
+        if decl.name() in exclude:
+            continue
+        if not decl.is_abstract():
+            out.append(decl.name())
+        stack.extend(decl.subtypes())
+    return out
+
+
+METADATA_BATCH_SIZE = 1000
+
+
+def serialize_products(
+    ifc_type: str,
+    elems: Iterable[Any],
+    storey_by_guid: Dict[str, Any],
+    get_psets: Callable[..., Dict[str, Any]] | None,
+) -> bytes:
+    """Serializa elementos de um mesmo tipo IFC como pares "guid":{item} separados por vírgula."""
+    chunks: list[bytes] = []
+    append = chunks.append
+    dumps = orjson.dumps
+    storey_get = storey_by_guid.get
+    for elem in elems:
+        # GlobalId/Name existem em todo IfcRoot; Tag só em IfcElement
+        guid = elem.GlobalId
+        if not guid:
+            continue
+        try:
+            tag = elem.Tag
+        except AttributeError:
+            tag = None
+
+        item: Dict[str, Any] = {
+            "type": ifc_type,
+            "name": elem.Name,
+            "tag": tag,
+            "storey": storey_get(guid),
+        }
+
+        if get_psets:
             try:
-                return str(v)
+                item["psets"] = to_jsonable(get_psets(elem, should_inherit=True))  # type: ignore
             except Exception:
-                return {"id": getattr(v, "id", lambda: None)()}
-        if isinstance(v, (str, int, float, bool)) or v is None:
-            return v
-        if isinstance(v, dict):
-            return {str(k): to_jsonable(val) for k, val in v.items()}
-        if isinstance(v, (list, tuple, set)):
-            return [to_jsonable(x) for x in v]
-        # numpy / decimals
-        if hasattr(v, "item") and callable(getattr(v, "item")):
-            return to_jsonable(v.item())
-    except Exception:
-        pass
-    return str(v)
-
+                # Nunca derrubar o build por causa de um pset estranho
+                item["psets"] = {}
+        try:
+            encoded = dumps(item)
+        except orjson.JSONEncodeError:
+            # Mantém o elemento mesmo se algum pset não puder ser codificado
+            item["psets"] = {}
+            encoded = dumps(item)
+        append(dumps(guid) + b":" + encoded)
+    return b",".join(chunks)
 
-def get_storey_name(elem: Any) -> str | None:
-    """Tenta descobrir o IfcBuildingStorey que contém o elemento."""
-    # IFC2X3/IFC4: IfcProduct.ContainedInStructure -> IfcRelContainedInSpatialStructure.RelatingStructure
-    try:
-        rels = getattr(elem, "ContainedInStructure", None)
-        if rels:
-            for rel in rels:
-                struct = getattr(rel, "RelatingStructure", None)
-                if struct and hasattr(struct, "is_a") and struct.is_a("IfcBuildingStorey"):
-                    return getattr(struct, "Name", None) or getattr(struct, "LongName", None)
-    except Exception:
-        pass
-    return None
 
+def extract_metadata(ifc_path: Path, meta_path: Path, model: Any = None, tag: str = "") -> None:
+    """Grava em meta_path o JSON {guid: item} dos elementos do IFC.
 
-def extract_metadata(ifc_path: Path) -> Dict[str, Any]:
+    Os itens são serializados e escritos um a um, sem montar o dict inteiro
+    em memória. model: o IFC já aberto, se houver (senão é aberto aqui).
+    """
     if ifcopenshell is None:
-        print("[WARN] ifcopenshell não está instalado. metadata.json será vazio.")
-        return {}
+        log(f"{tag}[WARN] ifcopenshell não está instalado. metadata.json será vazio.")
+        meta_path.write_bytes(b"{}")
+        return
 
-    model = ifcopenshell.open(str(ifc_path))  # type: ignore
+    if model is None:
+        model = ifcopenshell.open(str(ifc_path))  # type: ignore
     # Import opcional de utilidades
     get_psets = None
     try:
-        from ifcopenshell.util.element import get_psets as _get_psets  # type: ignore
-        get_psets = _get_psets
+        from ifcopenshell.util.element import get_psets as _get_psets, get_type  # type: ignore
     except Exception:
         pass
-
-    out: Dict[str, Any] = {}
-
-    # Foco em elementos físicos (IfcProduct) exceto aberturas
-    for elem in model.by_type("IfcProduct"):
-        try:
-            if elem.is_a("IfcOpeningElement"):
-                continue
-            guid = getattr(elem, "GlobalId", None)
-            if not guid:
-                continue
-
-            item: Dict[str, Any] = {
-                "type": elem.is_a(),
-                "name": getattr(elem, "Name", None),
-                "tag": getattr(elem, "Tag", None),
-                "storey": get_storey_name(elem),
-            }
-
-            if get_psets:
-                try:
-                    item["psets"] = to_jsonable(get_psets(elem, include_inherited=True))  # type: ignore
-                except Exception:
-                    item["psets"] = {}
-            out[str(guid)] = item
-        except Exception:
-            # Nunca derrubar o build por causa de um elemento estranho
-            continue
-
-    return out
+    else:
+        # Psets herdados vêm do IfcTypeObject, compartilhado por muitas
+        # instâncias: resolve uma vez por tipo (cache por id, válido só
+        # para este modelo) e mescla com os psets do próprio elemento,
+        # como get_psets(elem, should_inherit=True) faria.
+        @functools.lru_cache(maxsize=None)
+        def type_psets(type_id: int) -> Dict[str, Any]:
+            return _get_psets(model.by_id(type_id), should_inherit=False)
+
+        def get_psets(elem: Any, should_inherit: bool = True) -> Dict[str, Any]:
+            own = _get_psets(elem, should_inherit=False)
+            type_obj = get_type(elem) if should_inherit else None
+            if not type_obj:
+                return own
+            psets = {name: dict(props) for name, props in type_psets(type_obj.id()).items()}
+            for name, props in own.items():
+                if name in psets:
+                    psets[name].update(props)
+                else:
+                    psets[name] = props
+            return psets
+
+    # by_type() materializa cada consulta uma única vez; as listas são
+    # reaproveitadas abaixo (o fatiamento em lotes usa len() e slices)
+    rels_contained = model.by_type("IfcRelContainedInSpatialStructure")
+    products_by_type = {t: model.by_type(t, include_subtypes=False) for t in product_types(model)}
+
+    # GUID -> nome do IfcBuildingStorey, numa única passada pelas relações
+    # em vez de percorrer ContainedInStructure de cada elemento
+    storey_by_guid: Dict[str, Any] = {}
+    for rel in rels_contained:
+        struct = rel.RelatingStructure
+        if struct and struct.is_a("IfcBuildingStorey"):
+            storey_name = struct.Name or struct.LongName
+            for obj in rel.RelatedElements:
+                storey_by_guid.setdefault(obj.GlobalId, storey_name)
+
+    # Foco em elementos físicos (IfcProduct) exceto aberturas: itera direto
+    # pelo índice de cada tipo concreto em vez de filtrar com is_a(). Os lotes
+    # nunca misturam tipos, então o "type" vem do próprio balde (nenhum
+    # is_a() por elemento).
+    batches = (
+        (t, products[i : i + METADATA_BATCH_SIZE])
+        for t, products in products_by_type.items()
+        for i in range(0, len(products), METADATA_BATCH_SIZE)
+    )
+
+    # Cada lote é escrito assim que serializado: no máximo um lote em memória
+    with meta_path.open("wb") as f:
+        f.write(b"{")
+        sep = b""
+        for t, batch in batches:
+            chunk = serialize_products(t, batch, storey_by_guid, get_psets)
+            if chunk:
+                f.write(sep + chunk)
+                sep = b","
+        f.write(b"}")
+
+
+# Tipos que o IfcConvert deixa de fora por padrão
+GEOM_EXCLUDE = ("IfcOpeningElement", "IfcSpace")
+
+
+def convert_ifc_to_glb_geom(model: Any, glb_path: Path) -> None:
+    """Equivalente a IfcConvert --center-model-geometry --use-element-guids, em processo.
+
+    Usa o iterador/serializador glTF do ifcopenshell.geom sobre o modelo já
+    aberto: evita subir um IfcConvert (e reabrir o IFC) por arquivo.
+    """
+    settings = ifcgeom.settings()
+
+    # --center-model-geometry: desloca pelo centro do bounding box
+    bounds = ifcgeom.iterator(settings, model, exclude=GEOM_EXCLUDE)
+    if not bounds.initialize():
+        raise RuntimeError("nenhuma geometria para converter")
+    bounds.compute_bounds(True)
+    lo, hi = bounds.bounds_min().components, bounds.bounds_max().components
+    settings.set("model-offset", tuple(-(a + b) / 2 for a, b in zip(lo, hi)))
+
+    serializer_settings = ifcgeom.serializer_settings()
+    serializer_settings.set("use-element-guids", True)
+    serializer = ifcgeom.serializers.gltf(str(glb_path), settings, serializer_settings)
+    serializer.setFile(model)
+    serializer.writeHeader()
+
+    it = ifcgeom.iterator(settings, model, exclude=GEOM_EXCLUDE)
+    if it.initialize():
+        while True:
+            serializer.write(it.get())
+            if not it.next():
+                break
+    serializer.finalize()
+
+    if not glb_path.exists() or glb_path.stat().st_size == 0:
+        raise RuntimeError(f"{glb_path.name} não foi gerado")
+
+
+def try_convert_ifc_to_glb_geom(model: Any, glb_path: Path, tag: str = "") -> bool:
+    """Tenta convert_ifc_to_glb_geom(); False se o módulo não existe ou a conversão falhou."""
+    if ifcgeom is None or model is None:
+        return False
+    glb_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        convert_ifc_to_glb_geom(model, glb_path)
+        return True
+    except Exception as e:
+        log(f"{tag}[WARN] ifcopenshell.geom falhou ({e}). Usando IfcConvert...")
+        return False
 
 
-def convert_ifc_to_glb(ifcconvert_bin: str, ifc_path: Path, glb_path: Path) -> None:
+def convert_ifc_to_glb(ifcconvert_bin: str, ifc_path: Path, glb_path: Path, tag: str = "") -> None:
     glb_path.parent.mkdir(parents=True, exist_ok=True)
 
     # Preferimos GUID no nome do nó (facilita seleção por GUID no viewer)
@@ -161,10 +414,10 @@ def convert_ifc_to_glb(ifcconvert_bin: str, ifc_path: Path, glb_path: Path) -> N
     base_cmd = [ifcconvert_bin, "--center-model-geometry", "--use-element-guids", str(ifc_path), str(glb_path)]
 
     try:
-        run(base_cmd)
+        run(base_cmd, tag=tag)
     except subprocess.CalledProcessError:
-        print("[WARN] Falhou com --use-element-guids. Tentando sem essa opção...")
-        run([ifcconvert_bin, "--center-model-geometry", str(ifc_path), str(glb_path)])
+        log(f"{tag}[WARN] Falhou com --use-element-guids. Tentando sem essa opção...")
+        run([ifcconvert_bin, "--center-model-geometry", str(ifc_path), str(glb_path)], tag=tag)
 
 
 @dataclass
@@ -172,6 +425,117 @@ class ModelEntry:
     name: str
     slug: str
     updated: str
+    digest: str = ""
+
+
+# Artefatos reaproveitados do cache quando o IFC não mudou
+CACHED_ARTIFACTS = ("model.glb", "metadata.json", "metadata.json.gz") + (
+    ("metadata.json.br",) if brotli is not None else ()
+)
+
+
+def precompress(path: Path) -> None:
+    """Grava <path>.gz (e <path>.br, se brotli estiver instalado) ao lado do arquivo.
+
+    O GitHub Pages não serve variantes pré-comprimidas sozinho; o viewer as
+    baixa e descomprime no navegador.
+    """
+    data = path.read_bytes()
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, 9, mtime=0))
+    br_path = path.with_name(path.name + ".br")
+    if brotli is not None:
+        br_path.write_bytes(brotli.compress(data, quality=11))
+    else:
+        # site/ não é apagado entre builds: um .br antigo seria servido pelo viewer
+        br_path.unlink(missing_ok=True)
+
+
+def ifc_digest(ifc_path: Path) -> str:
+    """sha256 do IFC; o script e a versão do ifcopenshell entram na chave para invalidar o cache quando a extração mudar."""
+    with ifc_path.open("rb") as f:
+        h = hashlib.file_digest(f, "sha256")
+    h.update(Path(__file__).read_bytes())
+    h.update(str(getattr(ifcopenshell, "version", None)).encode())
+    return h.hexdigest()
+
+
+def process_one(
+    ifc_path: Path,
+    site_dir: Path,
+    ifcconvert_bin: str,
+    viewer_html: bytes,
+    cache_dir: Path,
+    updated: str,
+    previous_digest: str | None = None,
+    previous_updated: str | None = None,
+) -> ModelEntry:
+    """Gera model.glb, metadata.json e index.html de um único IFC.
+
+    Função de nível de módulo para poder ser enviada a um ProcessPoolExecutor.
+    Se site/<slug>/ já foi gerado a partir do mesmo IFC (previous_digest, do
+    models.json anterior), não faz nada; se cache_dir/<sha256>/ já tem os
+    artefatos, apenas os copia. Nos dois casos "updated" continua sendo a
+    data em que os artefatos foram gerados, não a deste build.
+    """
+    name = ifc_path.stem
+    slug = slugify(name)
+    # Prefixo nos logs: vários modelos rodam em paralelo e a saída se intercala
+    tag = f"[{slug}] "
+
+    out_dir = site_dir / slug  # já criada por main()
+
+    glb_path = out_dir / "model.glb"
+    meta_path = out_dir / "metadata.json"
+    index_path = out_dir / "index.html"
+
+    log(f"{tag}=== {name} -> {slug} ===")
+    digest = ifc_digest(ifc_path)
+    cached = cache_dir / digest
+    updated_path = cached / "updated"
+    if digest == previous_digest and all((out_dir / a).exists() for a in CACHED_ARTIFACTS):
+        log(f"{tag}[INFO] IFC sem mudanças, mantendo site/{slug}")
+        updated = previous_updated or updated
+    elif all((cached / a).exists() for a in CACHED_ARTIFACTS):
+        log(f"{tag}[INFO] IFC sem mudanças, usando cache {digest[:12]}")
+        for a in CACHED_ARTIFACTS:
+            shutil.copyfile(cached / a, out_dir / a)
+        if brotli is None:
+            (out_dir / "metadata.json.br").unlink(missing_ok=True)
+        if updated_path.exists():
+            updated = updated_path.read_text(encoding="utf-8").strip() or updated
+    else:
+        # O IFC é aberto uma única vez. A conversão via ifcopenshell.geom
+        # segura o GIL e um ifcopenshell.file não é seguro entre threads,
+        # então ela roda antes da extração, no mesmo modelo. Só o IfcConvert
+        # (subprocesso, com seu próprio parse) roda em paralelo com ela.
+        model = ifcopenshell.open(str(ifc_path)) if ifcopenshell is not None else None  # type: ignore
+        converted = try_convert_ifc_to_glb_geom(model, glb_path, tag)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            glb_future = None
+            if not converted:
+                glb_future = executor.submit(convert_ifc_to_glb, ifcconvert_bin, ifc_path, glb_path, tag)
+
+            log(f"{tag}[INFO] Extraindo metadados...")
+            extract_metadata(ifc_path, meta_path, model, tag)
+            precompress(meta_path)
+
+            if glb_future is not None:
+                glb_future.result()
+
+        # Grava no cache via arquivo temporário + rename (outro worker pode
+        # estar processando um IFC idêntico)
+        cached.mkdir(parents=True, exist_ok=True)
+        for a in CACHED_ARTIFACTS:
+            tmp = cached / f"{a}.{os.getpid()}.tmp"
+            shutil.copyfile(out_dir / a, tmp)
+            os.replace(tmp, cached / a)
+        updated_path.write_text(updated, encoding="utf-8")
+
+    # Viewer (lido uma vez em main()); só reescreve se mudou
+    if not index_path.exists() or index_path.read_bytes() != viewer_html:
+        index_path.write_bytes(viewer_html)
+
+    return ModelEntry(name=name, slug=slug, updated=updated, digest=digest)
 
 
 def main() -> None:
@@ -181,6 +545,7 @@ def main() -> None:
     ap.add_argument("--viewer_template", default="viewer/index.html", help="HTML do viewer")
     ap.add_argument("--root_template", default="viewer/root_index.html", help="HTML do índice" )
     ap.add_argument("--ifcconvert", default=None, help="Caminho do IfcConvert")
+    ap.add_argument("--cache_dir", default=".cache/ifc", help="Cache de artefatos por sha256 do IFC")
 
     args = ap.parse_args()
 
@@ -189,6 +554,7 @@ def main() -> None:
     site_dir = repo_root / args.site_dir
     viewer_template = repo_root / args.viewer_template
     root_template = repo_root / args.root_template
+    cache_dir = repo_root / args.cache_dir
 
     if not viewer_template.exists():
         raise FileNotFoundError(f"Viewer template não encontrado: {viewer_template}")
@@ -201,43 +567,74 @@ def main() -> None:
         print(f"[INFO] Pasta {ifc_dir} não existe. Nada a fazer.")
         return
 
-    # Limpa site/
-    if site_dir.exists():
-        shutil.rmtree(site_dir)
+    # site/ não é apagado: sincroniza com o conjunto atual de IFCs. O
+    # models.json anterior diz de qual sha256 (e quando) cada slug foi gerado.
     site_dir.mkdir(parents=True, exist_ok=True)
-
+    previous: dict[str, dict[str, Any]] = {}
+    models_json_path = site_dir / "models.json"
+    if models_json_path.exists():
+        try:
+            previous = {m["path"]: m for m in orjson.loads(models_json_path.read_bytes())}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            print("[WARN] models.json anterior inválido; todos os modelos serão regerados.")
+
+    ifc_paths = sorted(ifc_dir.glob("*.ifc"))
+    n = len(ifc_paths)
+    slugs = [slugify(p.stem) for p in ifc_paths]
+    # Os modelos rodam em processos paralelos: dois IFCs com o mesmo slug
+    # escreveriam em site/<slug>/ ao mesmo tempo
+    by_slug: dict[str, list[str]] = {}
+    for ifc_path, slug in zip(ifc_paths, slugs):
+        by_slug.setdefault(slug, []).append(ifc_path.name)
+    clashes = {slug: names for slug, names in by_slug.items() if len(names) > 1}
+    if clashes:
+        detail = "; ".join(f"{slug}: {', '.join(names)}" for slug, names in clashes.items())
+        raise ValueError(f"IFCs com o mesmo slug (renomeie um deles): {detail}")
+    for slug in slugs:
+        os.makedirs(site_dir / slug, exist_ok=True)
+    viewer_html = viewer_template.read_bytes()
+    # Um único carimbo de data por build
+    updated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+    # Cada IFC é independente (IfcConvert é single-thread por invocação):
+    # processa vários em paralelo, um por núcleo. map() preserva a ordem.
     models: list[ModelEntry] = []
-
-    for ifc_path in sorted(ifc_dir.glob("*.ifc")):
-        name = ifc_path.stem
-        slug = slugify(name)
-
-        out_dir = site_dir / slug
-        out_dir.mkdir(parents=True, exist_ok=True)
-
-        glb_path = out_dir / "model.glb"
-        meta_path = out_dir / "metadata.json"
-        index_path = out_dir / "index.html"
-
-        print(f"\n=== {name} -> {slug} ===")
-        convert_ifc_to_glb(ifcconvert_bin, ifc_path, glb_path)
-
-        print("[INFO] Extraindo metadados...")
-        metadata = extract_metadata(ifc_path)
-        meta_path.write_text(json.dumps(metadata, ensure_ascii=False), encoding="utf-8")
-
-        # Copia viewer
-        shutil.copy2(viewer_template, index_path)
-
-        updated = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-        models.append(ModelEntry(name=name, slug=slug, updated=updated))
+    if ifc_paths:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(n, os.cpu_count() or 1)) as executor:
+            models = list(
+                executor.map(
+                    process_one,
+                    ifc_paths,
+                    [site_dir] * n,
+                    [ifcconvert_bin] * n,
+                    [viewer_html] * n,
+                    [cache_dir] * n,
+                    [updated] * n,
+                    [previous.get(slug, {}).get("sha256") for slug in slugs],
+                    [previous.get(slug, {}).get("updated") for slug in slugs],
+                )
+            )
+
+    # Remove só os slugs que não existem mais
+    current = {m.slug for m in models}
+    for entry in site_dir.iterdir():
+        if entry.is_dir() and not entry.name.startswith(".") and entry.name not in current:
+            print(f"[INFO] Removendo modelo antigo: {entry.name}")
+            shutil.rmtree(entry, ignore_errors=True)
+
+    # Entradas de cache que não correspondem a nenhum IFC atual
+    if cache_dir.exists():
+        digests = {m.digest for m in models}
+        for entry in cache_dir.iterdir():
+            if entry.is_dir() and entry.name not in digests:
+                shutil.rmtree(entry, ignore_errors=True)
 
     # models.json
-    models_json = [{"name": m.name, "path": m.slug, "updated": m.updated} for m in models]
-    (site_dir / "models.json").write_text(json.dumps(models_json, ensure_ascii=False, indent=2), encoding="utf-8")
+    models_json = [{"name": m.name, "path": m.slug, "updated": m.updated, "sha256": m.digest} for m in models]
+    models_json_path.write_bytes(orjson.dumps(models_json, option=orjson.OPT_INDENT_2))
 
     # index.html (root)
-    shutil.copy2(root_template, site_dir / "index.html")
+    shutil.copyfile(root_template, site_dir / "index.html")
 
     print("\n[OK] Site gerado em:", site_dir)
 